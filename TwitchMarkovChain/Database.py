@@ -773,6 +773,51 @@ class Database:
             )''',
                                values=item + item)
 
+    def add_rule_batch(self, items: List[List[str]]) -> None:
+        """Add a batch of 3-grams to the knowledge base, grouped per table.
+
+        Equivalent to calling `add_rule_queue` for every item in `items`, but
+        the items are grouped by the MarkovGrammar table they target, and each
+        group is inserted with a single executemany in one transaction. This
+        turns the per-word INSERTs of a learned sentence into a handful of
+        prepared-statement batches.
+
+        The same recursive and invalid items that `add_rule_queue` skips are
+        skipped here as well.
+
+        Args:
+            items (List[List[str]]): The 3-grams of one sentence, e.g.
+                [['How', 'are', 'you'], ['are', 'you', '<END>']].
+        """
+        grouped = {}
+        for item in items:
+            # Filter out recursive case.
+            if self.check_equal(item):
+                continue
+            if "" in item:  # prevent adding invalid rules. Ideally this wouldn't trigger, but it seems to happen rarely.
+                logger.warning(
+                    f"Failed to add item to rules. Item contains empty string: {item!r}")
+                continue
+            suffix = self.get_suffix(item[0][0]) + self.get_suffix(item[1][0])
+            grouped.setdefault(suffix, []).append(tuple(item + item))
+
+        if not grouped:
+            return
+
+        with sqlite3.connect(self.db_name) as conn:
+            cur = conn.cursor()
+            for suffix, values in grouped.items():
+                cur.executemany(f'''
+                    INSERT OR REPLACE INTO MarkovGrammar{suffix} (word1, word2, word3, count)
+                    VALUES (?, ?, ?, coalesce(
+                        (
+                            SELECT count + 1 FROM MarkovGrammar{suffix}
+                            WHERE word1 = ? COLLATE BINARY AND word2 = ? COLLATE BINARY AND word3 = ? COLLATE BINARY
+                        ),
+                        1)
+                    )''', values)
+            conn.commit()
+
     def add_start_queue(self, item: List[str]) -> None:
         """Adds a rule to the queue, ready to be entered into the knowledge base, given a 2-gram `item`.
 
@@ -1,25 +1,59 @@
 import os
+import atexit
 import logging
-import datetime
+import logging.handlers
+import queue
 import threading
 import sys
 
-# Set up logging to a file in the same directory as this script
+# Set up logging to a file in the same directory as this script.
+# Records are pushed onto a queue and written by a background listener thread,
+# buffered in memory and flushed in batches, so hot-path logging calls never
+# block on a write() syscall. WARNING or higher flushes the buffer immediately.
 log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'markov_debug.log')
+# Open the log file with a 64 KiB buffer, so records flushed out of the
+# MemoryHandler are batched into large write() syscalls instead of one per
+# record; note close() only flushes this stream buffer, not the MemoryHandler
+_log_stream = open(log_path, 'w', buffering=1 << 16, encoding='utf-8')  # Overwrite each run; use 'a' to append
+_log_file_handler = logging.StreamHandler(_log_stream)
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
+_log_buffer_handler = logging.handlers.MemoryHandler(
+    capacity=512,
+    flushLevel=logging.WARNING,
+    target=_log_file_handler
+)
+_log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.DEBUG,
-    filename=log_path,
-    filemode='w',  # Overwrite each run; use 'a' to append
-    format='%(asctime)s %(levelname)s: %(message)s'
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
-
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_buffer_handler)
+_log_listener.start()
+# On shutdown (atexit is LIFO): stop the listener so every queued record has
+# reached the MemoryHandler, flush the MemoryHandler into the stream - stop()
+# alone drains the queue but leaves sub-WARNING records buffered - and only
+# then close the stream
+atexit.register(_log_stream.close)
+atexit.register(_log_buffer_handler.flush)
+atexit.register(_log_listener.stop)
+
+from collections import deque
 from typing import List, Tuple
 
 from TwitchWebsocket import Message, TwitchWebsocket
-from nltk.tokenize import sent_tokenize
+import nltk
+import selectors
 import socket, time, re, string
 import random
 
+# Load the punkt sentence tokenizer once at startup, rather than paying a
+# resource lookup per sent_tokenize call (and a download on the first
+# LookupError mid-chat). Left as None to download on demand if unavailable.
+try:
+    _PUNKT = nltk.data.load("tokenizers/punkt/english.pickle")
+except LookupError:
+    _PUNKT = None
+
 from Settings import Settings, SettingsData
 from Database import Database
 from Timer import LoopingTimer
@@ -29,36 +63,98 @@ from Log import Log
 Log(__file__)
 
 logger = logging.getLogger(__name__)
+# Captured once at import: whether hot-loop INFO records would be emitted at
+# all. Lets the learning loop skip building log arguments when filtered out.
+_INFO_ON = logger.isEnabledFor(logging.INFO)
 
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
+# Frozenset of punctuation for O(1) membership tests in sentence_length,
+# instead of substring searches through string.punctuation
+_PUNCTUATION = frozenset(string.punctuation)
+
+# The characters a Twitch command can start with, for check_if_other_command
+_CMD_PREFIXES = frozenset("!/.")
+
+# Matches an emote modifier suffix in an emotes tag: an underscore up to (but
+# not including) the next ":", e.g. "_HF" in "emote_HF:0-10"
+_EMOTE_MODIFIER_RE = re.compile(r"_[^:]*(?=:)")
+
+# Matches the Unicode tag characters (U+E0000..U+E007F); a compiled
+# character-class search scans the string in C rather than per-char ord()
+_PRIVATE_UNICODE_RE = re.compile("[\U000E0000-\U000E007F]")
+
 def contains_private_unicode(key):
     if not key:
         return False
+    search = _PRIVATE_UNICODE_RE.search
     for word in key:
-        if any(0xE0000 <= ord(char) <= 0xE007F for char in word):
+        if search(word):
             return True
     return False
 
+def _check_filter_noop(message):
+    """Stand-in for `MarkovChain.check_filter` while the blacklist is empty."""
+    return False
+
+class MockMessage:
+    """Minimal stand-in for a TwitchWebsocket Message, used for manual triggers."""
+    __slots__ = ("user", "message", "type", "channel")
+
+    def __init__(self, user, message, channel, msg_type="PRIVMSG"):
+        self.user = user
+        self.message = message
+        self.type = msg_type
+        self.channel = channel  # Use the bot's channel
+
 class MarkovChain:
     def __init__(self):
         self.prev_message_t = 0
         self._enabled = True
         # This regex should detect similar phrases as links as Twitch does
         self.link_regex = re.compile("\w+\.[a-z]{2,}")
+        # Bound search method, saving two attribute lookups per check_link call
+        self._link_search = self.link_regex.search
         # List of moderators used in blacklist modification, includes broadcaster
         self.mod_list = []
         self.set_blacklist()
         self.last_trigger_time = 0
+        # mtime of the working directory at the last trigger-file poll
+        self._trigger_dir_mtime = None
         self._randomized_timer_thread = None
         self._randomized_timer_stop = threading.Event()
+        # Cache of stripped message -> sentence list, as chat repeats itself often.
+        # Bounded via FIFO eviction to keep memory in check.
+        self._sent_cache = {}
+        self._sent_cache_maxsize = 2048
+        # TTL cache of the valid starting keys, so parameterless generations
+        # don't re-read all 27 MarkovStart tables every time
+        self._all_starts_cache = None
+        self._all_starts_cache_t = 0.0
+        self._all_starts_ttl = 60
 
         # Fill previously initialised variables with data from the settings.txt file
         Settings(self)
         self.db = Database(self.chan)
 
+        # Dispatch table for the whispered blacklist moderation commands
+        self._whisper_commands = {
+            "!blacklist": self.whisper_blacklist,
+            "!whitelist": self.whisper_whitelist,
+            "!check": self.whisper_check,
+        }
+
+        # Classifies moderation/help commands in a single regex pass,
+        # rather than one startswith scan per command
+        self._cmd_classifier = re.compile(
+            r"^(?:(?P<help>!(?:ghelp|genhelp|generatehelp))"
+            r"|(?P<enable>!enable)"
+            r"|(?P<disable>!disable)"
+            r"|(?P<setcd>!set(?:cooldown|cd)))"
+        )
+
         # Set up daemon Timer to send help messages
         if self.help_message_timer > 0:
             if self.help_message_timer < 300:
@@ -75,11 +171,10 @@ class MarkovChain:
             t = LoopingTimer(self.automatic_generation_timer, self.send_automatic_generation_message)
             t.start()
 
-        # Set up daemon Timer to check for manual triggers from GUI
-        t = LoopingTimer(1, lambda: self.check_for_manual_trigger())
-        t.start()
-        # Start TCP trigger server in a background thread
-        threading.Thread(target=self.tcp_trigger_server, daemon=True).start()
+        # Serve GUI trigger requests (TCP and trigger files) from a single
+        # selector-driven thread, instead of a 1 Hz polling timer thread plus
+        # a blocking accept loop
+        threading.Thread(target=self.trigger_event_loop, daemon=True).start()
 
         self.ws = TwitchWebsocket(host=self.host, 
                                   port=self.port,
@@ -89,7 +184,9 @@ class MarkovChain:
                                   callback=self.message_handler,
                                   capability=["commands", "tags"],
                                   live=True)
-        timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
+        # Bound once; the timer threads call this every cycle
+        self._send = self.ws.send_message
+        timestamp = self._ts()
         print(f"{timestamp} [TwitchWebsocket.TwitchWebsocket] [INFO    ] - Attempting to initialize websocket connection.", flush=True)
         self.ws.start_bot()
 
@@ -100,8 +197,12 @@ class MarkovChain:
         self.chan = settings["Channel"]
         self.nick = settings["Nickname"]
         self.auth = settings["Authentication"]
-        self.denied_users = [user.lower() for user in settings["DeniedUsers"]] + [self.nick.lower()]
-        self.allowed_users = [user.lower() for user in settings["AllowedUsers"]]
+        # Sets, as these are only ever tested for membership
+        self.denied_users = {user.lower() for user in settings["DeniedUsers"]} | {self.nick.lower()}
+        self.allowed_users = {user.lower() for user in settings["AllowedUsers"]}
+        # The broadcaster and the allowed users folded into one frozenset, so
+        # check_if_permissions is a single membership test per message
+        self._privileged_users = frozenset(self.allowed_users) | {self.chan.replace("#", "").lower()}
         self.cooldown = int(settings["Cooldown"])
         self.key_length = settings["KeyLength"]
         self.max_sentence_length = settings["MaxSentenceWordAmount"]
@@ -113,12 +214,30 @@ class MarkovChain:
         self.sent_separator = settings["SentenceSeparator"]
         self.allow_generate_params = settings["AllowGenerateParams"]
         self.generate_commands = tuple(settings["GenerateCommands"])
+        # Frozenset copy for O(1) membership testing in check_if_generate
+        self._generate_commands_set = frozenset(self.generate_commands)
+        # First-token dispatch table for chat commands, so message_handler
+        # resolves the handler with one dict lookup
+        self._privmsg_dispatch = {cmd: self._handle_generate for cmd in self.generate_commands}
         self.cooldown_warned = False
         # New randomized timer fields
         self.randomized_generation_timer_enabled = settings.get("RandomizedGenerationTimerEnabled", False)
         self.randomized_generation_timer_min = settings.get("RandomizedGenerationTimerMin", 30)
         self.randomized_generation_timer_max = settings.get("RandomizedGenerationTimerMax", 100)
 
+    def _ts(self, _cache=[0, ""]) -> str:
+        """Return the "[%m/%d/%Y - %H:%M:%S]:" timestamp prefix used for console output.
+
+        Memoized per second (in the shared `_cache` default), so the frequent
+        same-second calls on the message path cost an integer compare instead
+        of a full strftime.
+        """
+        now = int(time.time())
+        if now != _cache[0]:
+            _cache[0] = now
+            _cache[1] = time.strftime("[%m/%d/%Y - %H:%M:%S]:", time.localtime(now))
+        return _cache[1]
+
     def _start_randomized_generation_timer(self):
         if self._randomized_timer_thread and self._randomized_timer_thread.is_alive():
             return  # Already running
@@ -131,7 +250,7 @@ class MarkovChain:
             min_val = max(5, self.randomized_generation_timer_min)
             wait_time = random.randint(min_val, self.randomized_generation_timer_max)
             logger.info(f"[RandomizedTimer] Next message in {wait_time} seconds.")
-            timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]")
+            timestamp = time.strftime("[%m/%d/%Y - %H:%M:%S]")
             print(f"{timestamp}: (RandomizedTimer) Selected wait time: {wait_time} seconds.", flush=True)
             for _ in range(wait_time):
                 if self._randomized_timer_stop.is_set() or not getattr(self, 'randomized_generation_timer_enabled', False):
@@ -146,7 +265,7 @@ class MarkovChain:
             
             # Check if the message type indicates a successful channel join
             if m.type == "366":
-                timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
+                timestamp = self._ts()
                 logger.info(f"Successfully joined channel: #{m.channel}")
                 print(f"{timestamp} Successfully joined channel: #{m.channel}", flush=True)
                 # Request the list of moderators for modifying the blacklist
@@ -169,8 +288,16 @@ class MarkovChain:
 
             # Handle user messages (PRIVMSG and WHISPER)
             elif m.type in ("PRIVMSG", "WHISPER"):
+                # Classify any moderation/help command in a single pass
+                classified = self._cmd_classifier.match(m.message)
+                command = classified.lastgroup if classified else None
+
+                # Evaluate permissions once per message; the result cannot
+                # change while this message is being handled
+                has_permissions = self.check_if_permissions(m)
+
                 # Check if the message is a command to enable the generate feature
-                if m.message.startswith("!enable") and self.check_if_permissions(m):
+                if command == "enable" and has_permissions:
                     if self._enabled:
                         self.ws.send_whisper(m.user, "The generate command is already enabled.")
                     else:
@@ -179,7 +306,7 @@ class MarkovChain:
                         logger.info("Users can now use generate command again.")
 
                 # Check if the message is a command to disable the generate feature
-                elif m.message.startswith("!disable") and self.check_if_permissions(m):
+                elif command == "disable" and has_permissions:
                     if self._enabled:
                         self.ws.send_whisper(m.user, "Users can now no longer use generate command.")
                         self._enabled = False
@@ -188,7 +315,7 @@ class MarkovChain:
                         self.ws.send_whisper(m.user, "The generate command is already disabled.")
 
                 # Check if the message is a command to set the cooldown
-                elif m.message.startswith(("!setcooldown", "!setcd")) and self.check_if_permissions(m):
+                elif command == "setcd" and has_permissions:
                     split_message = m.message.split(" ")
                     if len(split_message) == 2:
                         try:
@@ -196,11 +323,11 @@ class MarkovChain:
                         except ValueError:
                             self.ws.send_whisper(m.user, f"The parameter must be an integer amount, eg: !setcd 30")
                             return
-                    self.cooldown = cooldown
-                    Settings.update_cooldown(cooldown)  # Update the cooldown in settings
-                    self.ws.send_whisper(m.user, f"The !generate cooldown has been set to {cooldown} seconds.")
-                else:
-                    self.ws.send_whisper(m.user, f"Please add exactly 1 integer parameter, eg: !setcd 30.")
+                        self.cooldown = cooldown
+                        Settings.update_cooldown(cooldown)  # Update the cooldown in settings
+                        self.ws.send_whisper(m.user, f"The !generate cooldown has been set to {cooldown} seconds.")
+                    else:
+                        self.ws.send_whisper(m.user, f"Please add exactly 1 integer parameter, eg: !setcd 30.")
 
                 # Process regular chat messages
                 if m.type == "PRIVMSG":
@@ -208,53 +335,17 @@ class MarkovChain:
                     if m.user.lower() in self.denied_users:
                         return
                     
-                    # Check if the message is a generate command
-                    if self.check_if_generate(m.message):
-                        # If generate command is disabled and user lacks permissions, ignore the message
-                        if not self.enable_generate_command and not self.check_if_permissions(m):
-                            return
-
-                        # If the generate feature is disabled, send a whisper to the user
-                        if not self._enabled:
-                            if not self.db.check_whisper_ignore(m.user):
-                                self.send_whisper(m.user, "The !generate has been turned off. !nopm to stop me from whispering you.")
-                            return
-
-                        cur_time = time.time()
-                        remaining = int(self.prev_message_t + self.cooldown - cur_time)
-                        if self.prev_message_t + self.cooldown < cur_time or self.check_if_permissions(m):
-                            # Check if the message passes the filter
-                            if self.check_filter(m.message):
-                                sentence = "You can't make me say that, you madman!"
-                            else:
-                                # Tokenize the message to extract parameters for generation
-                                params = tokenize(m.message)[2:] if self.allow_generate_params else None
-                                # Generate a sentence based on the parameters
-                                sentence, success = self.generate(params)
-                                if success:
-                                    # Reset the previous message time if a message was generated
-                                    self.prev_message_t = time.time()
-                                    self.cooldown_warned = False  # Reset warning flag after successful generation
-                            logger.info(sentence)  # Log the generated sentence
-                            self.ws.send_message(sentence)  # Send the generated sentence to the chat
-                            timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
-                            print(f"{timestamp} {sentence}", flush=True)  # Print with timecode for GUI
-                            logging.debug(f"[DEBUG] About to send message to Twitch: {repr(sentence)}")
-                            logging.debug(f"[DEBUG] Message sent successfully")
-                        else:
-                            if not self.cooldown_warned:
-                                self.ws.send_message(f"Yap Bot's on cooldown for {max(1, remaining)} seconds")
-                                self.cooldown_warned = True
-                            # If cooldown is active, inform the user
-                            if not self.db.check_whisper_ignore(m.user):
-                                self.send_whisper(m.user, f"Cooldown hit: {self.prev_message_t + self.cooldown - cur_time:0.2f} out of {self.cooldown:.0f}s remaining. !nopm to stop these cooldown pm's.")
-                            logger.info(f"Cooldown hit with {self.prev_message_t + self.cooldown - cur_time:0.2f}s remaining.")
-                            timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
-                            print(f"{timestamp} Cooldown hit with {self.prev_message_t + self.cooldown - cur_time:0.2f}s remaining.", flush=True)
+                    # Check if the message is a generate command; the first
+                    # "word" is parsed once and dispatched through the
+                    # precomputed command table
+                    first = m.message.split(None, 1)
+                    handler = self._privmsg_dispatch.get(first[0]) if first else None
+                    if handler is not None:
+                        handler(m, has_permissions)
                         return
-                    
+
                     # Handle help command
-                    elif m.message.startswith(("!ghelp", "!genhelp", "!generatehelp")):
+                    elif command == "help":
                         self.send_help_message()
 
                     # Ignore the message if it is deemed a command
@@ -282,58 +373,62 @@ class MarkovChain:
                     
                     else:
                         # Split the message into sentences using NLTK's tokenizer
-                        try:
-                            sentences = sent_tokenize(m.message.strip(), language="english")
-                            logger.info(f"Successfully split message into sentences: {sentences}")
-                        except LookupError:
-                            logger.debug("Downloading required punkt resource...")
-                            import nltk
-                            nltk.download('punkt')  # Download the punkt tokenizer resource
-                            logger.debug("Downloaded required punkt resource.")
-                            sentences = sent_tokenize(m.message.strip(), language="english")
-                            logger.info(f"Successfully split message into sentences after downloading resource: {sentences}")
+                        sentences = self.sent_tokenize_cached(m.message.strip())
 
                         # Process each sentence
                         for sentence in sentences:
-                            logger.info(f"Processing sentence: {sentence}")  # Log the current sentence being processed
-                            
+                            if _INFO_ON:
+                                logger.info("Processing sentence: %s", sentence)  # Log the current sentence being processed
+
                             # Tokenize the sentence into words
                             words = tokenize(sentence)
-                            logger.info(f"Tokenized sentence into words: {words}")  # Log the tokenized words
-                            
+                            if _INFO_ON:
+                                logger.info("Tokenized sentence into words: %s", words)  # Log the tokenized words
+
                             # Remove empty words caused by double spaces
                             if "" in words:
                                 words = [word for word in words if word]
-                                logger.info(f"Removed empty words, resulting in: {words}")  # Log the cleaned words
+                                if _INFO_ON:
+                                    logger.info("Removed empty words, resulting in: %s", words)  # Log the cleaned words
 
                             # Ignore sentences that are too short
                             if len(words) <= self.key_length:
-                                logger.info(f"Ignored sentence due to short length: {sentence}")
+                                if _INFO_ON:
+                                    logger.info("Ignored sentence due to short length: %s", sentence)
                                 continue
-                            
+
                             # Add a new starting point for a sentence to the database
-                            self.db.add_start_queue([words[x] for x in range(self.key_length)])
-                            logger.info(f"Added starting point to database: {[words[x] for x in range(self.key_length)]}")
+                            start = [words[x] for x in range(self.key_length)]
+                            self.db.add_start_queue(start)
+                            if _INFO_ON:
+                                logger.info("Added starting point to database: %s", start)
 
-                            # Create a key variable for the grammar dictionary
+                            # Create a key variable for the grammar dictionary,
+                            # and collect the sentence's 3-grams to insert as one batch
                             key = list()
+                            rules = []
                             for word in words:
                                 # Set up key for first use
                                 if len(key) < self.key_length:
                                     key.append(word)
                                     continue
-                                
-                                # Add the current key and word to the database
-                                self.db.add_rule_queue(key + [word])
-                                logger.info(f"Added rule to database: {key + [word]}")  # Log the rule added
-                                
+
+                                # Collect the current key and word as a rule
+                                rules.append(key + [word])
+                                if _INFO_ON:
+                                    logger.info("Added rule to database: %s", rules[-1])  # Log the rule added
+
                                 # Update the key for the next word
                                 key.pop(0)
                                 key.append(word)
-                            
+
                             # Add <END> at the end of the sentence
-                            self.db.add_rule_queue(key + ["<END>"])
-                            logger.info(f"Added end marker to database for sentence: {key + ['<END>']}")
+                            rules.append(key + ["<END>"])
+                            if _INFO_ON:
+                                logger.info("Added end marker to database for sentence: %s", rules[-1])
+
+                            # Insert all of the sentence's rules in grouped executemany batches
+                            self.db.add_rule_batch(rules)
                         
                 elif m.type == "WHISPER":
                     # Allow users to manage their whisper settings
@@ -348,42 +443,13 @@ class MarkovChain:
                         self.ws.send_whisper(m.user, "You will again be sent whispers. Type !nopm to disable again. ")
 
                     # Allow moderators and allowed users to manage the blacklist
-                    elif m.user.lower() in self.mod_list + ["cubiedev"] + self.allowed_users:
-                        # Adding to the blacklist
-                        if self.check_if_our_command(m.message, "!blacklist"):
-                            if len(m.message.split()) == 2:
-                                word = m.message.split()[1].lower()
-                                self.blacklist.append(word)
-                                logger.info(f"Added `{word}` to Blacklist.")
-                                self.write_blacklist(self.blacklist)
-                                self.ws.send_whisper(m.user, "Added word to Blacklist.")
-                            else:
-                                self.ws.send_whisper(m.user, "Expected Format: `!blacklist word` to add `word` to the blacklist")
-
-                        # Removing from the blacklist
-                        elif self.check_if_our_command(m.message, "!whitelist"):
-                            if len(m.message.split()) == 2:
-                                word = m.message.split()[1].lower()
-                                try:
-                                    self.blacklist.remove(word)
-                                    logger.info(f"Removed `{word}` from Blacklist.")
-                                    self.write_blacklist(self.blacklist)
-                                    self.ws.send_whisper(m.user, "Removed word from Blacklist.")
-                                except ValueError:
-                                    self.ws.send_whisper(m.user, "Word was already not in the blacklist.")
-                            else:
-                                self.ws.send_whisper(m.user, "Expected Format: `!whitelist word` to remove `word` from the blacklist.")
-                        
-                        # Checking whether a word is in the blacklist
-                        elif self.check_if_our_command(m.message, "!check"):
-                            if len(m.message.split()) == 2:
-                                word = m.message.split()[1].lower()
-                                if word in self.blacklist:
-                                    self.ws.send_whisper(m.user, "This word is in the Blacklist.")
-                                else:
-                                    self.ws.send_whisper(m.user, "This word is not in the Blacklist.")
-                            else:
-                                self.ws.send_whisper(m.user, "Expected Format: `!check word` to check whether `word` is on the blacklist.")
+                    elif m.user.lower() in self.mod_list or m.user.lower() == "cubiedev" or m.user.lower() in self.allowed_users:
+                        # Split the message once and dispatch on the first word;
+                        # each handler reuses the same split
+                        parts = m.message.split()
+                        handler = self._whisper_commands.get(parts[0]) if parts else None
+                        if handler:
+                            handler(m.user, parts)
 
                 elif m.type == "CLEARMSG":
                     # If a message is deleted, its contents will be unlearned
@@ -391,9 +457,92 @@ class MarkovChain:
 
         except Exception as e:
             logger.exception(e)
-            timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
+            timestamp = self._ts()
             print(f"{timestamp} Exception: {e}", flush=True)
 
+    def _handle_generate(self, m: Message, has_permissions: bool) -> None:
+        """Handle a generate command sent in chat, e.g. "!generate" or "!g".
+
+        Dispatched from `message_handler` via `self._privmsg_dispatch`.
+
+        Args:
+            m (Message): The Message object that was sent from Twitch.
+            has_permissions (bool): Whether `m.user` has heightened permissions.
+        """
+        # If generate command is disabled and user lacks permissions, ignore the message
+        if not self.enable_generate_command and not has_permissions:
+            return
+
+        # If the generate feature is disabled, send a whisper to the user
+        if not self._enabled:
+            if not self.db.check_whisper_ignore(m.user):
+                self.send_whisper(m.user, "The !generate has been turned off. !nopm to stop me from whispering you.")
+            return
+
+        cur_time = time.time()
+        remaining = int(self.prev_message_t + self.cooldown - cur_time)
+        if self.prev_message_t + self.cooldown < cur_time or has_permissions:
+            # Check if the message passes the filter
+            if self.check_filter(m.message):
+                sentence = "You can't make me say that, you madman!"
+            else:
+                # Tokenize the message to extract parameters for generation
+                params = tokenize(m.message)[2:] if self.allow_generate_params else None
+                # Generate a sentence based on the parameters
+                sentence, success = self.generate(params)
+                if success:
+                    # Reset the previous message time if a message was generated
+                    self.prev_message_t = time.time()
+                    self.cooldown_warned = False  # Reset warning flag after successful generation
+            logger.info(sentence)  # Log the generated sentence
+            self.ws.send_message(sentence)  # Send the generated sentence to the chat
+            timestamp = self._ts()
+            print(f"{timestamp} {sentence}", flush=True)  # Print with timecode for GUI
+        else:
+            if not self.cooldown_warned:
+                self.ws.send_message(f"Yap Bot's on cooldown for {max(1, remaining)} seconds")
+                self.cooldown_warned = True
+            # If cooldown is active, inform the user
+            if not self.db.check_whisper_ignore(m.user):
+                self.send_whisper(m.user, f"Cooldown hit: {self.prev_message_t + self.cooldown - cur_time:0.2f} out of {self.cooldown:.0f}s remaining. !nopm to stop these cooldown pm's.")
+            logger.info(f"Cooldown hit with {self.prev_message_t + self.cooldown - cur_time:0.2f}s remaining.")
+            timestamp = self._ts()
+            print(f"{timestamp} Cooldown hit with {self.prev_message_t + self.cooldown - cur_time:0.2f}s remaining.", flush=True)
+
+    def sent_tokenize_cached(self, text: str) -> List[str]:
+        """Split `text` into sentences, caching results for repeated messages.
+
+        Twitch chat contains a lot of repetition (emote spam, copypasta), so a
+        cache hit replaces the full NLTK punkt pass with a dict lookup.
+
+        Args:
+            text (str): The stripped message to split into sentences.
+
+        Returns:
+            List[str]: The sentences that make up `text`.
+        """
+        global _PUNKT
+
+        cached = self._sent_cache.get(text)
+        if cached is not None:
+            return list(cached)
+
+        if _PUNKT is None:
+            logger.debug("Downloading required punkt resource...")
+            nltk.download('punkt')  # Download the punkt tokenizer resource
+            logger.debug("Downloaded required punkt resource.")
+            _PUNKT = nltk.data.load("tokenizers/punkt/english.pickle")
+
+        sentences = _PUNKT.tokenize(text)
+        if _INFO_ON:
+            logger.info("Successfully split message into sentences: %s", sentences)
+
+        # Evict the oldest entry once the cache is full (FIFO)
+        if len(self._sent_cache) >= self._sent_cache_maxsize:
+            self._sent_cache.pop(next(iter(self._sent_cache)))
+        self._sent_cache[text] = tuple(sentences)
+        return sentences
+
     def generate(self, params: List[str] = None) -> "Tuple[str, bool]":
         """Given an input sentence, generate the remainder of the sentence using the learned data.
 
@@ -432,7 +581,7 @@ class MarkovChain:
             if contains_private_unicode(key):
                 logging.debug(f"[DEBUG] Fallback: multi-word params contain private unicode: {repr(key)} | params: {repr(params)}")
                 return f'I haven\'t extracted "{detokenize(key)}" from chat yet.', False
-            sentences[0] = params.copy()
+            sentences[0] = list(params)
             logging.debug(f"[DEBUG] Multi-word params, using key: {repr(key)}")
         elif len(params) == 1:
             key = self.db.get_next_single_start(params[0])
@@ -449,60 +598,171 @@ class MarkovChain:
                 if key is None:
                     logging.debug(f"[DEBUG] Fallback: haven't extracted {params[0]} from chat yet. | params: {repr(params)}")
                     return f'I haven\'t extracted "{params[0]}" from chat yet.', False
-            sentences[0] = key.copy()
+            sentences[0] = list(key)
             logging.debug(f"[DEBUG] Single-word param, using key: {repr(key)}")
         else:
-            all_keys = [k for k in self.db.get_all_starts() if k and not contains_private_unicode(k)]
+            all_keys = self.get_all_starts_cached()
             logging.debug(f"[DEBUG] All valid starting keys: {[repr(k) for k in all_keys]}")
             if all_keys:
                 key = random.choice(all_keys)
                 logging.debug(f"[DEBUG] Chosen starting key: {repr(key)}")
-                sentences[0] = key.copy()
+                sentences[0] = list(key)
             else:
                 logging.debug(f"[DEBUG] Fallback: not enough learned information. | params: {repr(params)}")
                 return "There is not enough learned information yet.", False
         
-        # Counter to prevent infinite loops (i.e. constantly generating <END> while below the 
+        # Running word count, updated as words are appended, so the loop guard
+        # does not rescan every generated token on every iteration
+        word_count = self.sentence_length(sentences)
+
+        # The knowledge base stores 3-grams, so key_length is 2 in practice;
+        # run the loop specialized for that case when possible
+        if self.key_length == 2:
+            self._generate_loop_k2(sentences, key, word_count)
+        else:
+            self._generate_loop(sentences, key, word_count)
+
+        # If there were params, but the sentence resulting is identical to the params
+        # Then the params did not result in an actual sentence
+        # If so, restart without params
+        if len(params) > 0 and params == sentences[0]:
+            logging.debug(f"[DEBUG] Fallback: params identical to generated sentence. Params: {repr(params)}, Sentence: {repr(sentences[0])}")
+            return "I haven't learned what to do with \"" + detokenize(params[-self.key_length:]) + "\" yet.", False
+
+        return self.sent_separator.join(detokenize(sentence) for sentence in sentences), True
+
+    def _generate_loop_k2(self, sentences: List[List[str]], key: List[str], word_count: int) -> None:
+        """Run the word-generation loop, specialized for `key_length == 2`.
+
+        The two-word key window is kept in two locals, so shifting the window
+        each iteration is a plain variable swap instead of a list or deque
+        mutation.
+
+        Args:
+            sentences (List[List[str]]): The sentences generated so far. Extended in place.
+            key (List[str]): The two-word starting key.
+            word_count (int): The number of words already in `sentences`.
+        """
+        k0, k1 = key
+
+        # Bind the attributes touched every iteration to locals; LOAD_FAST
+        # beats the repeated attribute lookups in a loop this hot
+        get_next = self.db.get_next
+        get_next_initial = self.db.get_next_initial
+        get_start = self.db.get_start
+        max_len = self.max_sentence_length
+        min_len = self.min_sentence_length
+
+        # Counter to prevent infinite loops (i.e. constantly generating <END> while below the
         # minimum number of words to generate)
         i = 0
-        while self.sentence_length(sentences) < self.max_sentence_length and i < self.max_sentence_length * 2:
+        while word_count < max_len and i < max_len * 2:
             # Use key to get next word
             if i == 0:
                 # Prevent fetching <END> on the first word
-                word = self.db.get_next_initial(i, key)
+                word = get_next_initial(i, (k0, k1))
             else:
-                word = self.db.get_next(i, key)
+                word = get_next(i, (k0, k1))
 
             i += 1
 
             if word == "<END>" or word == None:
                 # Break, unless we are before the min_sentence_length
-                if i < self.min_sentence_length:
-                    key = self.db.get_start()
+                if i < min_len:
+                    new_key = get_start()
+                    # Ensure that the key can be generated. Otherwise we still stop.
+                    if new_key:
+                        # Start a new sentence with a single C-level copy
+                        sentences.append(list(new_key))
+                        for entry in new_key:
+                            if entry not in _PUNCTUATION and entry[0] != "'":
+                                word_count += 1
+                        k0, k1 = new_key[0], new_key[1]
+                        continue
+                break
+
+            # Otherwise add the word
+            sentences[-1].append(word)
+            if word not in _PUNCTUATION and word[0] != "'":
+                word_count += 1
+
+            # Shift the key window so on the next iteration it gets the next item
+            k0, k1 = k1, word
+
+    def _generate_loop(self, sentences: List[List[str]], key: List[str], word_count: int) -> None:
+        """Run the word-generation loop for arbitrary key lengths.
+
+        Args:
+            sentences (List[List[str]]): The sentences generated so far. Extended in place.
+            key (List[str]): The starting key of `key_length` words.
+            word_count (int): The number of words already in `sentences`.
+        """
+        # Use a deque with maxlen as the sliding key window: appending a word
+        # automatically discards the oldest one, without the O(n) pop(0)
+        key = deque(key, maxlen=self.key_length)
+
+        # Bind the attributes touched every iteration to locals; LOAD_FAST
+        # beats the repeated attribute lookups in a loop this hot
+        get_next = self.db.get_next
+        get_next_initial = self.db.get_next_initial
+        get_start = self.db.get_start
+        max_len = self.max_sentence_length
+        min_len = self.min_sentence_length
+        key_length = self.key_length
+
+        # Counter to prevent infinite loops (i.e. constantly generating <END> while below the
+        # minimum number of words to generate)
+        i = 0
+        while word_count < max_len and i < max_len * 2:
+            # Use key to get next word
+            if i == 0:
+                # Prevent fetching <END> on the first word
+                word = get_next_initial(i, key)
+            else:
+                word = get_next(i, key)
+
+            i += 1
+
+            if word == "<END>" or word == None:
+                # Break, unless we are before the min_sentence_length
+                if i < min_len:
+                    key = deque(get_start(), maxlen=key_length)
                     # Ensure that the key can be generated. Otherwise we still stop.
                     if key:
-                        # Start a new sentence
-                        sentences.append([])
+                        # Start a new sentence with a single C-level copy
+                        sentences.append(list(key))
                         for entry in key:
-                            sentences[-1].append(entry)
+                            if entry not in _PUNCTUATION and entry[0] != "'":
+                                word_count += 1
                         continue
                 break
 
             # Otherwise add the word
             sentences[-1].append(word)
-            
-            # Shift the key so on the next iteration it gets the next item
-            key.pop(0)
+            if word not in _PUNCTUATION and word[0] != "'":
+                word_count += 1
+
+            # Shift the key so on the next iteration it gets the next item;
+            # the deque's maxlen drops the oldest word automatically
             key.append(word)
-        
-        # If there were params, but the sentence resulting is identical to the params
-        # Then the params did not result in an actual sentence
-        # If so, restart without params
-        if len(params) > 0 and params == sentences[0]:
-            logging.debug(f"[DEBUG] Fallback: params identical to generated sentence. Params: {repr(params)}, Sentence: {repr(sentences[0])}")
-            return "I haven't learned what to do with \"" + detokenize(params[-self.key_length:]) + "\" yet.", False
 
-        return self.sent_separator.join(detokenize(sentence) for sentence in sentences), True
+    def get_all_starts_cached(self) -> List[List[str]]:
+        """Return all valid starting keys, cached with a short TTL.
+
+        `db.get_all_starts` reads every MarkovStart table, which is too
+        expensive to repeat per parameterless generation. Starts learned
+        while the cache is warm become eligible once the TTL expires.
+
+        Returns:
+            List[List[str]]: The valid (non-empty, non-private-unicode)
+                starting keys.
+        """
+        now = time.time()
+        if self._all_starts_cache is None or now - self._all_starts_cache_t > self._all_starts_ttl:
+            self._all_starts_cache = [k for k in self.db.get_all_starts()
+                                      if k and not contains_private_unicode(k)]
+            self._all_starts_cache_t = now
+        return self._all_starts_cache
 
     def sentence_length(self, sentences: List[List[str]]) -> int:
         """Given a list of tokens representing a sentence, return the number of words in there.
@@ -519,7 +779,7 @@ class MarkovChain:
         count = 0
         for sentence in sentences:
             for token in sentence:
-                if token not in string.punctuation and token[0] != "'":
+                if token not in _PUNCTUATION and token[0] != "'":
                     count += 1
         return count
 
@@ -532,22 +792,13 @@ class MarkovChain:
         Returns:
             List[str]: List of strings that show modifiers, such as "_HZ" for horizontal flip.
         """
-        output = []
-        try:
-            while emotes:
-                u_index = emotes.index("_")
-                c_index = emotes.index(":", u_index)
-                output.append(emotes[u_index:c_index])
-                emotes = emotes[c_index:]
-        except ValueError:
-            pass
-        return output
-
-    def write_blacklist(self, blacklist: List[str]) -> None:
-        """Write blacklist.txt given a list of banned words.
+        return _EMOTE_MODIFIER_RE.findall(emotes)
+
+    def write_blacklist(self, blacklist: "set[str]") -> None:
+        """Write blacklist.txt given a set of banned words.
 
         Args:
-            blacklist (List[str]): The list of banned words to write.
+            blacklist (set[str]): The set of banned words to write.
         """
         logger.debug("Writing Blacklist...")
         with open("blacklist.txt", "w") as f:
@@ -555,59 +806,115 @@ class MarkovChain:
         logger.debug("Written Blacklist.")
 
     def set_blacklist(self) -> None:
-        """Read blacklist.txt and set `self.blacklist` to the list of banned words."""
+        """Read blacklist.txt and set `self.blacklist` to the set of banned words."""
         logger.debug("Loading Blacklist...")
         try:
             with open("blacklist.txt", "r") as f:
-                self.blacklist = [l.replace("\n", "") for l in f.readlines()]
+                self.blacklist = {l.replace("\n", "") for l in f.readlines()}
                 logger.debug("Loaded Blacklist.")
-        
+
         except FileNotFoundError:
             logger.warning("Loading Blacklist Failed!")
-            self.blacklist = ["<start>", "<end>"]
+            self.blacklist = {"<start>", "<end>"}
             self.write_blacklist(self.blacklist)
 
+        self.update_blacklist_matcher()
+
+    def whisper_blacklist(self, user: str, parts: List[str]) -> None:
+        """Handle the whispered `!blacklist word` command by adding `word` to the blacklist.
+
+        Args:
+            user (str): The user who sent the whisper.
+            parts (List[str]): The whispered message, already split on whitespace.
+        """
+        if len(parts) == 2:
+            word = parts[1].lower()
+            self.blacklist.add(word)
+            self.update_blacklist_matcher()
+            logger.info(f"Added `{word}` to Blacklist.")
+            self.write_blacklist(self.blacklist)
+            self.ws.send_whisper(user, "Added word to Blacklist.")
+        else:
+            self.ws.send_whisper(user, "Expected Format: `!blacklist word` to add `word` to the blacklist")
+
+    def whisper_whitelist(self, user: str, parts: List[str]) -> None:
+        """Handle the whispered `!whitelist word` command by removing `word` from the blacklist.
+
+        Args:
+            user (str): The user who sent the whisper.
+            parts (List[str]): The whispered message, already split on whitespace.
+        """
+        if len(parts) == 2:
+            word = parts[1].lower()
+            try:
+                self.blacklist.remove(word)
+                self.update_blacklist_matcher()
+                logger.info(f"Removed `{word}` from Blacklist.")
+                self.write_blacklist(self.blacklist)
+                self.ws.send_whisper(user, "Removed word from Blacklist.")
+            except KeyError:
+                self.ws.send_whisper(user, "Word was already not in the blacklist.")
+        else:
+            self.ws.send_whisper(user, "Expected Format: `!whitelist word` to remove `word` from the blacklist.")
+
+    def whisper_check(self, user: str, parts: List[str]) -> None:
+        """Handle the whispered `!check word` command by reporting whether `word` is blacklisted.
+
+        Args:
+            user (str): The user who sent the whisper.
+            parts (List[str]): The whispered message, already split on whitespace.
+        """
+        if len(parts) == 2:
+            word = parts[1].lower()
+            if word in self.blacklist:
+                self.ws.send_whisper(user, "This word is in the Blacklist.")
+            else:
+                self.ws.send_whisper(user, "This word is not in the Blacklist.")
+        else:
+            self.ws.send_whisper(user, "Expected Format: `!check word` to check whether `word` is on the blacklist.")
+
     def send_help_message(self) -> None:
         """Send a Help message to the connected chat, as long as the bot wasn't disabled."""
         if self._enabled:
             logger.info("Help message sent.")
             try:
-                self.ws.send_message("Learn how this bot generates sentences here: https://github.com/CubieDev/TwitchMarkovChain#how-it-works")
-            except socket.OSError as error:
+                self._send("Learn how this bot generates sentences here: https://github.com/CubieDev/TwitchMarkovChain#how-it-works")
+            except OSError as error:
                 logger.warning(f"[OSError: {error}] upon sending help message. Ignoring.")
 
     def send_automatic_generation_message(self) -> None:
         """Send an automatic generation message to the connected chat.
-        
+
         As long as the bot wasn't disabled, just like if someone typed "!g" in chat.
         """
-        if self._enabled:
-            sentence, success = self.generate()
-            if success:
-                logger.info(sentence)
-                timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
-                print(f"{timestamp} Message generated by automatic timer:", flush=True)
-                print(f"{timestamp} {sentence}", flush=True)
-                # Try to send a message. Just log a warning on fail
-                try:
-                    self.ws.send_message(sentence)
-                except socket.OSError as error:
-                    logger.warning(f"[OSError: {error}] upon sending automatic generation message. Ignoring.")
-            else:
-                logger.info("Attempted to output automatic generation message, but there is not enough learned information yet.")
+        if not self._enabled:
+            return
+        sentence, success = self.generate()
+        if not success:
+            logger.info("Attempted to output automatic generation message, but there is not enough learned information yet.")
+            return
+        logger.info(sentence)
+        timestamp = self._ts()
+        print(f"{timestamp} Message generated by automatic timer:", flush=True)
+        print(f"{timestamp} {sentence}", flush=True)
+        # Try to send a message. Just log a warning on fail
+        try:
+            self._send(sentence)
+        except OSError as error:
+            logger.warning(f"[OSError: {error}] upon sending automatic generation message. Ignoring.")
 
     def send_randomized_generation_message(self):
         """Send a randomized generation message to the connected chat, then schedule the next one."""
         if self._enabled:
-            timestamp = datetime.datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]")
+            timestamp = time.strftime("[%m/%d/%Y - %H:%M:%S]")
             print(f"{timestamp}: (RandomizedTimer): Generating and sending message via randomized timer.", flush=True)
             sentence, success = self.generate()
             if success:
                 print(f"{timestamp}: {sentence}", flush=True)
                 logger.info(sentence)
                 try:
-                    self.ws.send_message(sentence)
-                except socket.OSError as error:
+                    self._send(sentence)
+                except OSError as error:
                     logger.warning(f"[OSError: {error}] upon sending randomized generation message. Ignoring.")
             else:
                 logger.info("Attempted to output randomized generation message, but there is not enough learned information yet.")
@@ -622,16 +929,63 @@ class MarkovChain:
         if self.whisper_cooldown:
             self.ws.send_whisper(user, message)
 
+    def update_blacklist_matcher(self) -> None:
+        """Compile `self.blacklist` into the single regex used by `check_filter`.
+
+        The pattern is one alternation over all banned words and phrases,
+        longest first, with word boundaries wherever an entry starts or ends
+        in a word character. One C-level scan of the message then replaces
+        tokenizing it and testing every token against the set.
+
+        An Aho-Corasick automaton (pyahocorasick, or a hand-rolled trie)
+        would scale better for blacklists of many thousands of entries, but
+        the C extension is not a dependency we ship, a Python-level trie walk
+        is slower than the C regex scan at realistic blacklist sizes, and an
+        unanchored automaton would also lose the word-boundary semantics
+        (e.g. a banned "ass" must not match inside "class").
+
+        A cruder fast path - r"\w+".findall over a lowercased message, then
+        set membership per word - was also considered and rejected: it cannot
+        match multi-word blacklist phrases or entries containing punctuation,
+        both of which the single alternation scan handles for free.
+        """
+        parts = []
+        for entry in sorted(self.blacklist, key=len, reverse=True):
+            if not entry:
+                continue
+            pattern = re.escape(entry.lower())
+            # Only anchor on word boundaries where the entry edge is a word
+            # character; entries like "<start>" have no boundary to anchor on
+            if entry[0].isalnum() or entry[0] == "_":
+                pattern = r"\b" + pattern
+            if entry[-1].isalnum() or entry[-1] == "_":
+                pattern = pattern + r"\b"
+            parts.append(pattern)
+        # IGNORECASE, so check_filter needn't allocate a lowercased copy
+        # of every message it scans
+        if parts:
+            self._blacklist_regex = re.compile("|".join(parts), re.IGNORECASE)
+            # Drop any no-op shadow so the real method is reachable again
+            self.__dict__.pop("check_filter", None)
+        else:
+            self._blacklist_regex = None
+            # With nothing to match, shadow check_filter on the instance with
+            # a plain function that returns False, skipping even the method
+            # bind and None test on every message
+            self.check_filter = _check_filter_noop
+
     def check_filter(self, message: str) -> bool:
         """Returns True if message contains a banned word.
-        
+
+        Matching is case-insensitive via the compiled pattern, so no
+        lowercased copies of the message or its tokens are allocated here.
+
         Args:
             message (str): The message to check.
         """
-        for word in tokenize(message):
-            if word.lower() in self.blacklist:
-                return True
-        return False
+        if self._blacklist_regex is None:
+            return False
+        return self._blacklist_regex.search(message) is not None
 
     def check_if_our_command(self, message: str, *commands: "Tuple[str]") -> bool:
         """True if the first "word" of the message is in the tuple of commands
@@ -643,7 +997,9 @@ class MarkovChain:
         Returns:
             bool: True if the first word in message is one of the commands.
         """
-        return message.split()[0] in commands
+        # maxsplit=1 avoids splitting the entire message for just the first word
+        first = message.split(None, 1)
+        return bool(first) and first[0] in commands
 
     def check_if_generate(self, message: str) -> bool:
         """True if the first "word" of the message is one of the defined generate commands.
@@ -654,7 +1010,9 @@ class MarkovChain:
         Returns:
             bool: True if the first word in message is a generate command.
         """
-        return self.check_if_our_command(message, *self.generate_commands)
+        # maxsplit=1 avoids splitting the entire message for just the first word
+        first = message.split(None, 1)
+        return bool(first) and first[0] in self._generate_commands_set
     
     def check_if_other_command(self, message: str) -> bool:
         """True if the message is any command, except /me. 
@@ -668,7 +1026,12 @@ class MarkovChain:
             bool: True if the message is any potential command (starts with a '!', '/' or '.')
                 with the exception of /me.
         """
-        return message.startswith(("!", "/", ".")) and not message.startswith("/me")
+        # Cheapest check first: most chat messages don't start with a command
+        # character at all, and only '/' needs the extra /me test
+        prefix = message[:1]
+        if prefix not in _CMD_PREFIXES:
+            return False
+        return prefix != "/" or not message.startswith("/me")
     
     def check_if_permissions(self, m: Message) -> bool:
         """True if the user has heightened permissions.
@@ -680,7 +1043,7 @@ class MarkovChain:
             m (Message): The Message object that was sent from Twitch. 
                 Has `user` and `channel` attributes.
         """
-        return m.user == m.channel or m.user in self.allowed_users
+        return m.user in self._privileged_users
 
     def check_link(self, message: str) -> bool:
         """True if `message` contains a link.
@@ -691,59 +1054,106 @@ class MarkovChain:
         Returns:
             bool: True if the message contains a link.
         """
-        return self.link_regex.search(message)
+        return self._link_search(message) is not None
 
     def trigger_yap(self, user="ManualTrigger"):
-        from datetime import datetime
-        timestamp = datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
+        timestamp = self._ts()
+        # These trigger-path prints are read from stdout by the GUI, so they
+        # must stay as flushed prints rather than move to the logger
         print(f"{timestamp} Generate command triggered manually", flush=True)
         # Use the first generate command from settings
         command = self.generate_commands[0] if self.generate_commands else "!generate"
-        class MockMessage:
-            def __init__(self, user, message, channel, msg_type="PRIVMSG"):
-                self.user = user
-                self.message = message
-                self.type = msg_type
-                self.channel = channel  # Use the bot's channel
         # Create a mock message for the trigger
         mock_msg = MockMessage(user, command, self.chan)
         # Process it through the message handler
         self.message_handler(mock_msg, check_trigger=False)
 
     def check_for_manual_trigger(self):
-        import time
-        import glob
-        from datetime import datetime
-        trigger_files = glob.glob("trigger_yap_*.txt")
+        # The directory's mtime changes whenever a file is created or removed
+        # in it, so one stat() tells us whether a scan can be skipped; this
+        # runs every second and on every message, and triggers are rare
+        try:
+            dir_mtime = os.stat(".").st_mtime
+        except OSError:
+            dir_mtime = None
+        if dir_mtime is not None and dir_mtime == self._trigger_dir_mtime:
+            return
+        self._trigger_dir_mtime = dir_mtime
+
+        # scandir filters on the names from one readdir pass, without glob's
+        # per-call pattern translation or a stat per entry
+        with os.scandir(".") as it:
+            trigger_files = [
+                e.name for e in it
+                if e.name.startswith("trigger_yap_") and e.name.endswith(".txt")
+                and e.is_file(follow_symlinks=False)
+            ]
+        # Remove every trigger file in one pass, then yap at most once:
+        # several files dropped between polls mean one trigger, and leaving
+        # files behind would re-trip the rate limit on every following poll
+        removed = False
         for trigger_file in trigger_files:
+            try:
+                os.remove(trigger_file)
+                removed = True
+            except FileNotFoundError:
+                pass
+        if removed:
             now = time.time()
             if now - self.last_trigger_time > 1.5:
-                try:
-                    os.remove(trigger_file)
-                    timestamp = datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
-                    print(f"{timestamp} Generate command trigerred manually", flush=True)
-                    self.trigger_yap()
-                    self.last_trigger_time = now
-                except FileNotFoundError:
-                    pass
-
-    def tcp_trigger_server(self):
-        import socket
-        from datetime import datetime
+                timestamp = self._ts()
+                print(f"{timestamp} Generate command trigerred manually", flush=True)
+                self.trigger_yap()
+                self.last_trigger_time = now
+
+    def trigger_event_loop(self):
+        """Serve manual trigger requests from the GUI in a single thread.
+
+        The TCP trigger socket is registered with a selector, and the 1 second
+        select timeout doubles as the heartbeat for the trigger-file poll.
+        This replaces the dedicated 1 Hz polling timer thread and the blocking
+        accept loop.
+        """
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # The trigger protocol is a single tiny packet; no need for the
+        # default receive buffer size
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
         server.bind(('127.0.0.1', 8765))
         server.listen(5)
-        timestamp = datetime.now().strftime("[%m/%d/%Y - %H:%M:%S]:")
+        server.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ)
+        timestamp = self._ts()
         print(f"{timestamp} TCP server for manual triggers listening on 127.0.0.1:8765", flush=True)
         while True:
-            conn, _ = server.accept()
-            try:
-                data = conn.recv(1024)
-                if data and b"YAP" in data:
-                    self.trigger_yap()
-            finally:
-                conn.close()
+            events = selector.select(timeout=1.0)
+            if events:
+                # Drain every pending connection in this wakeup, rather than
+                # one accept per select round trip
+                while True:
+                    try:
+                        conn, _addr = server.accept()
+                    except BlockingIOError:
+                        break
+                    try:
+                        # One-shot transaction; don't let Nagle delay the reply path
+                        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        # A client that connects but never writes must not
+                        # wedge this single-threaded loop
+                        conn.settimeout(1.0)
+                        # The GUI sends exactly b"YAP": a 16-byte read and an
+                        # exact prefix compare beat a 1 KiB buffer and a
+                        # substring scan
+                        data = conn.recv(16)
+                        if data[:3] == b"YAP":
+                            self.trigger_yap()
+                    except OSError:
+                        pass
+                    finally:
+                        conn.close()
+            # Heartbeat: poll for trigger files dropped by the GUI
+            self.check_for_manual_trigger()
 
 if __name__ == "__main__":
     MarkovChain()
\ No newline at end of file
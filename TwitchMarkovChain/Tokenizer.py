@@ -1,5 +1,6 @@
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from nltk.tokenize.destructive import NLTKWordTokenizer
 from nltk.tokenize.treebank import TreebankWordDetokenizer
 from copy import deepcopy
@@ -53,6 +54,27 @@ EMOTICON_RE = re.compile(r"""
 _tokenize = MarkovChainTokenizer().tokenize
 _detokenize = TreebankWordDetokenizer().tokenize
 
+@lru_cache(maxsize=4096)
+def _tokenize_cached(sentence: str) -> Tuple[str, ...]:
+    """Tokenize `sentence`, returning an immutable tuple of tokens.
+
+    Cached so that repeated inputs (emote spam, copypasta) skip the regex work.
+    The tuple is converted to a fresh list by `tokenize` so callers can
+    safely mutate the result without corrupting the cache.
+    """
+    output = []
+
+    match = EMOTICON_RE.search(sentence)
+    while match:
+        output += _tokenize(sentence[:match.start()].strip())
+        output += [match.group()]
+        sentence = sentence[match.end():].strip()
+        match = EMOTICON_RE.search(sentence)
+
+    output += _tokenize(sentence)
+
+    return tuple(output)
+
 def tokenize(sentence: str) -> List[str]:
     """Word tokenize, separating commas, dots, apostrophes, etc.
 
@@ -61,25 +83,16 @@ def tokenize(sentence: str) -> List[str]:
 
     Furthermore, doesn't split emoticons, i.e. "<3" or ":)"
 
+    Repeated inputs are served from an LRU cache, as Twitch chat tends to
+    contain many identical messages.
+
     Args:
         sentence (str): Input sentence.
 
     Returns:
         List[str]: Tokenized output of the sentence.
     """
-    
-    output = []
-
-    match = EMOTICON_RE.search(sentence)
-    while match:
-        output += _tokenize(sentence[:match.start()].strip())
-        output += [match.group()]
-        sentence = sentence[match.end():].strip()
-        match = EMOTICON_RE.search(sentence)
-
-    output += _tokenize(sentence)
-
-    return output
+    return list(_tokenize_cached(sentence))
 
 def detokenize(tokenized: List[str]) -> str:
     """Detokenize a tokenized list of words and punctuation.